@@ -1,7 +1,9 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import bcrypt  # para comparar contraseñas encriptadas
@@ -20,7 +22,30 @@ if not SUPABASE_URL or not SUPABASE_KEY:
     st.error("Faltan las variables SUPABASE_URL o SUPABASE_KEY en el .env")
     st.stop()
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+@st.cache_resource
+def get_supabase() -> Client:
+    # Un solo cliente por proceso: se reutiliza entre reruns y sesiones, así
+    # su sesión HTTP mantiene las conexiones abiertas (keep-alive).
+    return create_client(SUPABASE_URL, SUPABASE_KEY)
+
+
+supabase: Client = get_supabase()
+
+# Eventos por página en la lista de eventos
+PAGE_SIZE = 25
+
+# Máximo de opciones que carga un selector con búsqueda
+PICKER_LIMIT = 50
+
+# Filas por página en las listas de asistentes
+ASISTENTES_PAGE_SIZE = 200
+
+# Columnas de eventos que usa la interfaz (evita traer todo con "*")
+EVENTO_COLUMNAS = (
+    "id,nombre,fecha_evento,limite_asistentes,"
+    "modelo_negocio_id,facultad_id,usuario_creador_id"
+)
 
 
 # ==========================
@@ -41,6 +66,21 @@ def get_organizaciones_dict():
     return {o["id"]: o["nombre"] for o in orgs}
 
 
+@st.cache_data(ttl=300, max_entries=256, show_spinner=False)
+def buscar_organizaciones(texto: str):
+    # Búsqueda en el servidor: solo viajan las primeras coincidencias.
+    # La clave es el texto escrito, así que la caché se acota en tamaño y
+    # tiempo para que no crezca sin límite ni oculte organizaciones nuevas.
+    try:
+        query = supabase.table("modelos_negocio").select("id,nombre")
+        if texto:
+            query = query.ilike("nombre", f"%{texto}%")
+        res = query.order("nombre").limit(PICKER_LIMIT).execute()
+        return res.data or []
+    except Exception:
+        return []
+
+
 @st.cache_data
 def get_facultades_all():
     try:
@@ -57,9 +97,61 @@ def get_facultades_dict():
 
 
 @st.cache_data
+def get_facultades_by_org_map():
+    # Agrupa las facultades por organización una sola vez
+    m = {}
+    for f in get_facultades_all():
+        m.setdefault(f["modelo_negocio_id"], []).append(f)
+    return m
+
+
 def get_facultades_por_org(org_id: int):
-    facs = get_facultades_all()
-    return [f for f in facs if f["modelo_negocio_id"] == org_id]
+    return get_facultades_by_org_map().get(org_id, [])
+
+
+@st.cache_data
+def get_org_label_map():
+    # Etiqueta del selectbox -> id, construido una vez por snapshot de datos
+    return {o["nombre"]: o["id"] for o in get_organizaciones()}
+
+
+@st.cache_data
+def get_fac_label_map(org_id: int):
+    fac_map = {"Sin facultad": None}
+    for f in get_facultades_por_org(org_id):
+        fac_map[f["nombre"]] = f["id"]
+    return fac_map
+
+
+@st.cache_data(ttl=3600)
+def get_rol_id(nombre: str):
+    """
+    Id del rol con ese nombre, o None si no existe. Los errores de red se
+    propagan para no dejar None en caché durante una hora.
+    """
+    res = supabase.table("roles").select("id").eq("nombre", nombre).limit(1).execute()
+    return res.data[0]["id"] if res.data else None
+
+
+def parse_fecha(valor):
+    # Fecha ISO de Supabase -> date; si no se puede, se devuelve tal cual.
+    try:
+        return date.fromisoformat(valor)
+    except (TypeError, ValueError):
+        return valor
+
+
+def ejecutor_paralelo(max_workers: int):
+    """
+    ThreadPoolExecutor cuyos hilos comparten el contexto de la ejecución
+    actual, para que las funciones en caché no avisen de que falta el
+    ScriptRunContext.
+    """
+    ctx = get_script_run_ctx()
+    return ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=lambda: add_script_run_ctx(ctx=ctx),
+    )
 
 
 # ==========================
@@ -70,6 +162,10 @@ def init_session():
         st.session_state.perfil = None
     if "evento_edit" not in st.session_state:
         st.session_state.evento_edit = None
+    if "eventos_cursores" not in st.session_state:
+        st.session_state.eventos_cursores = [None]
+    if "excel_reporte" not in st.session_state:
+        st.session_state.excel_reporte = None
 
 
 # ==========================
@@ -89,11 +185,12 @@ def login_view():
             return
 
         try:
-            # Buscamos SOLO por username
+            # Buscamos SOLO por username (a lo sumo una fila)
             res = (
                 supabase.table("usuarios")
-                .select("*, roles(nombre)")
+                .select("id, username, password, roles(nombre)")
                 .eq("username", username)
+                .limit(1)
                 .execute()
             )
 
@@ -116,8 +213,8 @@ def login_view():
                 st.error("Contraseña incorrecta.")
                 return
 
-            # Si llegó hasta aquí, login OK
-            perfil = user_row
+            # Si llegó hasta aquí, login OK (el hash no se guarda en sesión)
+            perfil = {k: v for k, v in user_row.items() if k != "password"}
             st.session_state.perfil = perfil
             st.success("Inicio de sesión correcto.")
             st.rerun()
@@ -129,39 +226,89 @@ def login_view():
 # ==========================
 # Funciones de eventos
 # ==========================
-def get_eventos_para_organizador(usuario_id: int):
+def query_eventos_activos(usuario_id=None):
     """
-    Devuelve la lista de eventos ACTIVO a los que un organizador tiene acceso:
+    Consulta base de eventos ACTIVO con los nombres de organización y facultad
+    embebidos. Si se indica usuario_id, se limita a los eventos a los que ese
+    organizador tiene acceso:
       - Eventos que él creó (usuario_creador_id)
       - Eventos donde está enrolado en eventos_organizadores
+    Todo en una sola consulta: el embebido de eventos_organizadores se filtra
+    por el usuario y el `or` conserva los eventos creados por él o con
+    enrolamiento. El embebido va vacío, `eventos_organizadores()`: solo sirve
+    para filtrar y no agrega columnas a la respuesta.
     """
-    # Eventos creados por el usuario
-    r1 = (
+    columnas = f"{EVENTO_COLUMNAS}, modelos_negocio(nombre), facultades(nombre)"
+    if usuario_id is None:
+        return supabase.table("eventos").select(columnas).eq("estado", "ACTIVO")
+
+    return (
         supabase.table("eventos")
-        .select("*")
-        .eq("usuario_creador_id", usuario_id)
+        .select(f"{columnas}, eventos_organizadores()")
         .eq("estado", "ACTIVO")
-        .execute()
+        .eq("eventos_organizadores.usuario_id", usuario_id)
+        .or_(f"usuario_creador_id.eq.{usuario_id},eventos_organizadores.not.is.null")
     )
 
-    # Eventos donde está enrolado
-    r2 = (
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_eventos_para_organizador(usuario_id: int):
+    """
+    Devuelve la lista completa de eventos ACTIVO a los que un organizador
+    tiene acceso (ver query_eventos_activos).
+    """
+    res = query_eventos_activos(usuario_id).execute()
+    return res.data or []
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_eventos_activos():
+    """
+    Todos los eventos ACTIVO para los selectores: id, nombre, creador y los
+    organizadores enrolados embebidos.
+    """
+    res = (
         supabase.table("eventos")
-        .select("*, eventos_organizadores!inner(usuario_id)")
-        .eq("eventos_organizadores.usuario_id", usuario_id)
+        .select("id,nombre,usuario_creador_id, eventos_organizadores(usuario_id)")
         .eq("estado", "ACTIVO")
         .execute()
     )
+    return res.data or []
 
-    eventos = {}
-    for e in r1.data:
-        eventos[e["id"]] = e
-    for e in r2.data:
-        eventos[e["id"]] = e
 
-    return list(eventos.values())
+@st.cache_data(ttl=30, show_spinner=False)
+def get_pagina_eventos(usuario_id, cursor):
+    """
+    Una página (PAGE_SIZE) de eventos ACTIVO con id < cursor, del más nuevo al
+    más antiguo. usuario_id=None trae los eventos públicos (vista estudiante).
+    """
+    query = query_eventos_activos(usuario_id)
+    if cursor is not None:
+        query = query.lt("id", cursor)
+    res = query.order("id", desc=True).limit(PAGE_SIZE).execute()
+    return res.data or []
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_organizadores(org_rol_id: int):
+    """Usuarios con rol organizador (cambian poco: caché de 5 minutos)."""
+    res = (
+        supabase.table("usuarios")
+        .select("id, username")
+        .eq("rol_id", org_rol_id)
+        .execute()
+    )
+    return res.data or []
 
 
+def invalidar_cache_eventos():
+    # Llamar después de cualquier insert/update sobre eventos o enrolamientos
+    get_eventos_para_organizador.clear()
+    get_eventos_activos.clear()
+    get_pagina_eventos.clear()
+
+
+@st.fragment
 def crear_evento_form(usuario_id: int):
     st.subheader("➕ Crear nuevo evento")
 
@@ -169,24 +316,21 @@ def crear_evento_form(usuario_id: int):
         nombre = st.text_input("Nombre del evento")
         fecha_evento = st.date_input("Fecha del evento", value=date.today())
 
-        # Organización (modelo de negocio)
-        orgs = get_organizaciones()
+        # Organización (modelo de negocio), buscada en el servidor
+        texto_org = st.text_input("Buscar organización", key="buscar_org_crear")
+        orgs = buscar_organizaciones(texto_org.strip())
         if orgs:
-            org_map = {o["nombre"]: o["id"] for o in orgs}
-            org_label = st.selectbox(
+            org = st.selectbox(
                 "Organización",
-                list(org_map.keys()),
+                orgs,
+                format_func=lambda o: o["nombre"],
                 key="org_crear"
             )
-            org_id = org_map[org_label]
+            org_id = org["id"]
 
             # Facultades de esa organización (opcional)
-            facs = get_facultades_por_org(org_id)
-            fac_options = ["Sin facultad"]
-            fac_map = {"Sin facultad": None}
-            for f in facs:
-                fac_options.append(f["nombre"])
-                fac_map[f["nombre"]] = f["id"]
+            fac_map = get_fac_label_map(org_id)
+            fac_options = list(fac_map.keys())
 
             fac_label = st.selectbox(
                 "Facultad (opcional)",
@@ -195,7 +339,10 @@ def crear_evento_form(usuario_id: int):
             )
             facultad_id = fac_map[fac_label]
         else:
-            st.info("No hay organizaciones configuradas todavía.")
+            if texto_org:
+                st.info("No hay organizaciones que coincidan con la búsqueda.")
+            else:
+                st.info("No hay organizaciones configuradas todavía.")
             org_id = None
             facultad_id = None
 
@@ -230,6 +377,7 @@ def crear_evento_form(usuario_id: int):
                 res = supabase.table("eventos").insert(data).execute()
                 if res.data:
                     st.success("Evento creado correctamente.")
+                    invalidar_cache_eventos()
                     st.rerun()
                 else:
                     st.error("No se pudo crear el evento.")
@@ -237,70 +385,181 @@ def crear_evento_form(usuario_id: int):
                 st.error(f"Error al crear evento: {e}")
 
 
+def eventos_a_dataframe(eventos):
+    # Una fila por evento, con los nombres embebidos ya resueltos
+    filas = []
+    for ev in eventos:
+        filas.append(
+            {
+                "ID": ev["id"],
+                "Evento": ev["nombre"],
+                "Fecha": parse_fecha(ev["fecha_evento"]),
+                "Límite": ev["limite_asistentes"] or 0,
+                "Organización": (ev.get("modelos_negocio") or {}).get("nombre") or "",
+                "Facultad": (ev.get("facultades") or {}).get("nombre") or "Sin facultad",
+            }
+        )
+    return pd.DataFrame(filas)
+
+
+def aplicar_cambios_eventos(eventos, editado, editor_key: str):
+    """
+    Guarda de una vez los cambios del editor de eventos:
+      - Las filas marcadas en "Eliminar" se desactivan con un único
+        update ... in (ids), sin enviar la fila completa.
+      - El resto de filas modificadas va en una única llamada a la RPC
+        actualizar_eventos, que solo toca nombre, fecha y límite de los
+        eventos que sigan ACTIVO.
+    """
+    cambios = st.session_state[editor_key]["edited_rows"]
+    if not cambios:
+        st.info("No hay cambios para aplicar.")
+        return
+
+    ids_eliminar = []
+    rows = []
+    for idx in cambios:
+        ev = eventos[idx]
+        fila = editado.iloc[idx]
+        if fila["Eliminar"]:
+            ids_eliminar.append(ev["id"])
+            continue
+        if pd.isna(fila["Evento"]) or not str(fila["Evento"]).strip():
+            st.error(f"El nombre del evento #{ev['id']} es obligatorio.")
+            return
+        if pd.isna(fila["Fecha"]):
+            st.error(f"La fecha del evento #{ev['id']} es obligatoria.")
+            return
+        limite = 0 if pd.isna(fila["Límite"]) else int(fila["Límite"])
+        rows.append(
+            {
+                "id": ev["id"],
+                "nombre": str(fila["Evento"]).strip(),
+                "fecha_evento": str(fila["Fecha"]),
+                "limite_asistentes": None if limite == 0 else limite,
+            }
+        )
+
+    try:
+        if rows:
+            supabase.rpc("actualizar_eventos", {"cambios": rows}).execute()
+        if ids_eliminar:
+            # Eliminación lógica: estado = INACTIVO
+            supabase.table("eventos").update(
+                {"estado": "INACTIVO"}
+            ).in_("id", ids_eliminar).execute()
+    except Exception as e:
+        st.error(f"Error al guardar cambios: {e}")
+        return
+
+    # El editor se reinicia sobre los datos ya guardados
+    del st.session_state[editor_key]
+
+    ev_edit = st.session_state.evento_edit
+    if ev_edit and ev_edit["id"] in ids_eliminar:
+        st.session_state.evento_edit = None
+    st.success("Cambios guardados.")
+    invalidar_cache_eventos()
+    st.rerun()
+
+
+@st.fragment
 def lista_eventos_view(usuario_id: int, es_organizador: bool):
+    # Fragmento: cambiar de página o editar la tabla solo re-ejecuta esta vista.
+    # Lo que afecta a otras vistas (guardar, abrir el formulario de edición)
+    # hace un st.rerun() completo.
     st.subheader("📋 Lista de eventos")
 
-    org_dict = get_organizaciones_dict()
-    fac_dict = get_facultades_dict()
+    # Paginación por keyset: la pila guarda el cursor (último id visto) de
+    # cada página; None es la primera página.
+    cursores = st.session_state.eventos_cursores
+    cursor = cursores[-1]
 
     try:
-        if es_organizador:
-            eventos = get_eventos_para_organizador(usuario_id)
-        else:
-            eventos = (
-                supabase.table("eventos")
-                .select("*")
-                .eq("estado", "ACTIVO")
-                .execute()
-                .data
-            )
+        eventos = get_pagina_eventos(usuario_id if es_organizador else None, cursor)
     except Exception as e:
         st.error(f"Error al obtener eventos: {e}")
         return
 
     if not eventos:
         st.info("No hay eventos para mostrar.")
-        return
-
-    for ev in eventos:
-        with st.container(border=True):
-            st.markdown(f"### {ev['nombre']}")
-            st.write(f"📅 **Fecha:** {ev['fecha_evento']}")
-
-            limite = ev["limite_asistentes"]
-            if limite is None:
-                st.write("👥 **Límite asistentes:** Ilimitado")
+    elif not es_organizador:
+        df = eventos_a_dataframe(eventos)
+        df["Límite"] = df["Límite"].map(lambda n: n or "Ilimitado").astype(str)
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    else:
+        # Una sola tabla editable en lugar de varios widgets por evento. Va
+        # dentro de un form: editar celdas no dispara reruns y todos los
+        # cambios se envían juntos con "Aplicar cambios".
+        df = eventos_a_dataframe(eventos)
+        df["Eliminar"] = False
+        editor_key = f"eventos_editor_{cursor}"
+
+        # El editor guarda los cambios por posición de fila. Si la página
+        # cambió desde la ejecución anterior (otro organizador creó o
+        # desactivó eventos), esas posiciones apuntarían a otros eventos:
+        # se descartan los cambios pendientes en lugar de aplicarlos.
+        ids_pagina = [ev["id"] for ev in eventos]
+        ids_key = f"{editor_key}_ids"
+        pagina_cambiada = st.session_state.get(ids_key, ids_pagina) != ids_pagina
+        st.session_state[ids_key] = ids_pagina
+        if pagina_cambiada and editor_key in st.session_state:
+            del st.session_state[editor_key]
+
+        with st.form("eventos_form", border=False, clear_on_submit=False):
+            editado = st.data_editor(
+                df,
+                key=editor_key,
+                use_container_width=True,
+                hide_index=True,
+                disabled=["ID", "Organización", "Facultad"],
+                column_config={
+                    "Fecha": st.column_config.DateColumn("Fecha"),
+                    "Límite": st.column_config.NumberColumn(
+                        "Límite", min_value=0, step=1, help="0 = ilimitado"
+                    ),
+                    "Eliminar": st.column_config.CheckboxColumn(
+                        "Eliminar", help="Desactiva el evento (eliminación lógica)"
+                    ),
+                },
+            )
+            aplicar = st.form_submit_button("Aplicar cambios", use_container_width=True)
+
+        if aplicar:
+            if pagina_cambiada:
+                st.error(
+                    "La lista de eventos cambió mientras editabas. "
+                    "Revisa la tabla y vuelve a aplicar los cambios."
+                )
             else:
-                st.write(f"👥 **Límite asistentes:** {limite}")
+                aplicar_cambios_eventos(eventos, editado, editor_key)
 
-            org_name = org_dict.get(ev.get("modelo_negocio_id"))
-            fac_name = fac_dict.get(ev.get("facultad_id"))
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            # Opciones por id: el selectbox devuelve la fila de la página actual
+            # y no una copia de la ejecución anterior
+            eventos_por_id = {ev["id"]: ev for ev in eventos}
+            ev_sel_id = st.selectbox(
+                "Evento a editar",
+                list(eventos_por_id),
+                format_func=lambda i: f"{eventos_por_id[i]['nombre']} (#{i})",
+                key="evento_a_editar",
+                label_visibility="collapsed",
+            )
+        with col2:
+            if st.button("✏️ Editar", use_container_width=True):
+                st.session_state.evento_edit = eventos_por_id[ev_sel_id]
+                st.rerun()
 
-            if org_name:
-                st.write(f"🏢 **Organización:** {org_name}")
-            if fac_name:
-                st.write(f"🏫 **Facultad:** {fac_name}")
-            else:
-                st.write("🏫 **Facultad:** Sin facultad")
-
-            st.caption(f"ID evento: {ev['id']}")
-
-            if es_organizador:
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button(f"✏️ Editar #{ev['id']}", key=f"edit_{ev['id']}"):
-                        st.session_state.evento_edit = ev
-                with col2:
-                    if st.button(f"🗑️ Eliminar #{ev['id']}", key=f"del_{ev['id']}"):
-                        try:
-                            # Eliminación lógica: estado = INACTIVO
-                            supabase.table("eventos").update(
-                                {"estado": "INACTIVO"}
-                            ).eq("id", ev["id"]).execute()
-                            st.success("Evento desactivado (eliminación lógica).")
-                            st.rerun()
-                        except Exception as e:
-                            st.error(f"Error al desactivar evento: {e}")
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if len(cursores) > 1 and st.button("⬅️ Anterior", key="eventos_prev"):
+            cursores.pop()
+            st.rerun(scope="fragment")
+    with col_next:
+        if len(eventos) == PAGE_SIZE and st.button("Siguiente ➡️", key="eventos_next"):
+            cursores.append(min(ev["id"] for ev in eventos))
+            st.rerun(scope="fragment")
 
 
 def editar_evento_view():
@@ -310,13 +569,9 @@ def editar_evento_view():
 
     st.subheader(f"✏️ Editar evento #{ev['id']}")
 
-    try:
-        fecha_val = date.fromisoformat(ev["fecha_evento"])
-    except Exception:
-        fecha_val = ev["fecha_evento"]
+    fecha_val = parse_fecha(ev["fecha_evento"])
 
     org_dict = get_organizaciones_dict()
-    fac_all = get_facultades_all()
 
     with st.container(border=True):
         nombre = st.text_input("Nombre del evento", value=ev["nombre"])
@@ -331,9 +586,8 @@ def editar_evento_view():
 
         # Organización actual
         org_id_actual = ev.get("modelo_negocio_id")
-        orgs = get_organizaciones()
-        org_options = [o["nombre"] for o in orgs]
-        org_map = {o["nombre"]: o["id"] for o in orgs}
+        org_map = get_org_label_map()
+        org_options = list(org_map.keys())
         if org_id_actual:
             org_label_default = org_dict.get(org_id_actual)
         else:
@@ -354,18 +608,11 @@ def editar_evento_view():
             st.info("No hay organizaciones configuradas.")
             org_id = None
 
-        # Facultades para la organización seleccionada
-        facs_org = get_facultades_por_org(org_id) if org_id else []
-        fac_options = ["Sin facultad"]
-        fac_map = {"Sin facultad": None}
-        for f in facs_org:
-            fac_options.append(f["nombre"])
-            fac_map[f["nombre"]] = f["id"]
+        # Facultades para la organización seleccionada (ninguna si no hay organización)
+        fac_map = get_fac_label_map(org_id) if org_id else {"Sin facultad": None}
+        fac_options = list(fac_map.keys())
 
-        fac_id_actual = ev.get("facultad_id")
-        fac_name_actual = None
-        if fac_id_actual:
-            fac_name_actual = next((f["nombre"] for f in fac_all if f["id"] == fac_id_actual), None)
+        fac_name_actual = get_facultades_dict().get(ev.get("facultad_id"))
 
         if fac_name_actual and fac_name_actual in fac_options:
             fac_label = st.selectbox(
@@ -398,6 +645,7 @@ def editar_evento_view():
                     supabase.table("eventos").update(data).eq("id", ev["id"]).execute()
                     st.success("Evento actualizado.")
                     st.session_state.evento_edit = None
+                    invalidar_cache_eventos()
                     st.rerun()
                 except Exception as e:
                     st.error(f"Error al actualizar evento: {e}")
@@ -411,18 +659,13 @@ def editar_evento_view():
 # ==========================
 # Enrolar organizadores a eventos
 # ==========================
+@st.fragment
 def enrolar_organizador_view():
     st.subheader("👥 Enrolar organizadores a un evento")
 
     try:
         # Solo eventos ACTIVO
-        eventos = (
-            supabase.table("eventos")
-            .select("id,nombre,usuario_creador_id")
-            .eq("estado", "ACTIVO")
-            .execute()
-            .data
-        )
+        eventos = get_eventos_activos()
     except Exception as e:
         st.error(f"Error al obtener eventos: {e}")
         return
@@ -431,42 +674,39 @@ def enrolar_organizador_view():
         st.info("No hay eventos disponibles.")
         return
 
-    mapa_eventos = {f"{e['nombre']} (#{e['id']})": e for e in eventos}
-    evento_label = st.selectbox(
+    # Opciones por id y fila recuperada de la lista recién cargada: tras
+    # enrolar, los enrolados embebidos ya reflejan el cambio
+    eventos_por_id = {e["id"]: e for e in eventos}
+    evento_id = st.selectbox(
         "Selecciona evento",
-        list(mapa_eventos.keys()),
+        list(eventos_por_id),
+        format_func=lambda i: f"{eventos_por_id[i]['nombre']} (#{i})",
         key="evento_enrolar"
     )
-    evento = mapa_eventos[evento_label]
-    evento_id = evento["id"]
+    evento = eventos_por_id[evento_id]
     creador_id = evento["usuario_creador_id"]
 
-    # Organizadores enrolados actualmente
+    # Traemos solo los ORGANIZADORES: el filtro por rol_id se resuelve en Supabase
     try:
-        enrolados_res = (
-            supabase.table("eventos_organizadores")
-            .select("usuario_id")
-            .eq("evento_id", evento_id)
-            .execute()
-        )
-        enrolados_ids = {row["usuario_id"] for row in enrolados_res.data}
-    except Exception:
-        enrolados_ids = set()
+        org_rol_id = get_rol_id("ORGANIZADOR")
+    except Exception as e:
+        st.error(f"Error al obtener el rol ORGANIZADOR: {e}")
+        return
+    if org_rol_id is None:
+        st.error("No se encontró el rol ORGANIZADOR.")
+        return
 
-    # Traemos solo los ORGANIZADORES (rol_id = 2 -> ajusta si tu id es otro)
     try:
-        ORG_ROLE_ID = 2
-        orgs_res = (
-            supabase.table("usuarios")
-            .select("id, username, rol_id")
-            .eq("rol_id", ORG_ROLE_ID)
-            .execute()
-        )
-        orgs = orgs_res.data or []
+        orgs = get_organizadores(org_rol_id)
     except Exception as e:
         st.error(f"Error al obtener organizadores: {e}")
         return
 
+    # Los enrolados vienen embebidos en la lista de eventos
+    enrolados_ids = {
+        row["usuario_id"] for row in evento.get("eventos_organizadores") or []
+    }
+
     enrolados_nombres = [o["username"] for o in orgs if o["id"] in enrolados_ids]
     st.write("Organizador principal (creador): ", f"**id {creador_id}**")
     if enrolados_nombres:
@@ -483,28 +723,93 @@ def enrolar_organizador_view():
         st.info("Ya no hay más organizadores disponibles para enrolar en este evento.")
         return
 
-    mapa_orgs = {
-        f"{o['username']} (id {o['id']})": o["id"] for o in candidatos
-    }
+    candidatos_por_id = {o["id"]: o for o in candidatos}
+    orgs_sel = st.multiselect(
+        "Selecciona organizadores",
+        list(candidatos_por_id),
+        format_func=lambda i: f"{candidatos_por_id[i]['username']} (id {i})",
+        key=f"orgs_enrolar_{evento_id}",
+    )
 
-    org_label = st.selectbox("Selecciona organizador", list(mapa_orgs.keys()))
+    if st.button("Enrolar organizadores", use_container_width=True):
+        if not orgs_sel:
+            st.error("Selecciona al menos un organizador.")
+            return
 
-    if st.button("Enrolar organizador", use_container_width=True):
-        data = {
-            "evento_id": evento_id,
-            "usuario_id": mapa_orgs[org_label],
-        }
+        # Un solo upsert con todas las filas, sin importar cuántos se elijan
+        rows = [{"evento_id": evento_id, "usuario_id": uid} for uid in orgs_sel]
         try:
-            supabase.table("eventos_organizadores").upsert(data).execute()
-            st.success("Organizador enrolado al evento.")
+            supabase.table("eventos_organizadores").upsert(rows).execute()
+            st.success(f"{len(rows)} organizador(es) enrolado(s) al evento.")
+            invalidar_cache_eventos()
             st.rerun()
         except Exception as e:
-            st.error(f"Error al enrolar organizador: {e}")
+            st.error(f"Error al enrolar organizadores: {e}")
 
 
 # ==========================
 # Dashboard general (organizador) + exportar Excel
 # ==========================
+@st.cache_data(ttl=30, show_spinner=False)
+def get_resumen_asistencia(eventos_ids):
+    """
+    {evento_id: {"registrados": n, "asistidos": m}} para los eventos dados.
+    El conteo lo hace Postgres (rpc resumen_asistencia); "registrados" son los
+    que aún no figuran como ASISTIDO.
+    """
+    res = supabase.rpc("resumen_asistencia", {"evento_ids": eventos_ids}).execute()
+    resumen = {e_id: {"registrados": 0, "asistidos": 0} for e_id in eventos_ids}
+    for r in res.data or []:
+        resumen[r["evento_id"]] = {
+            "registrados": r["registrados"],
+            "asistidos": r["asistidos"],
+        }
+    return resumen
+
+
+def generar_excel_eventos(eventos_dict, eventos_ids):
+    """
+    Bytes del .xlsx con el detalle de registros de los eventos dados. El
+    detalle fila por fila solo se necesita aquí; los datos de usuario vienen
+    embebidos en la misma consulta.
+    """
+    res_asist = (
+        supabase.table("eventos_asistentes")
+        .select(
+            "evento_id, usuario_id, registrado_en, estado, "
+            "usuarios(username,nombre_completo,correo)"
+        )
+        .in_("evento_id", eventos_ids)
+        .execute()
+    )
+    registros = res_asist.data or []
+
+    filas_excel = []
+    for r in registros:
+        ev = eventos_dict.get(r["evento_id"], {})
+        u = r.get("usuarios") or {}
+
+        filas_excel.append(
+            {
+                "ID evento": r["evento_id"],
+                "Nombre evento": ev.get("nombre", ""),
+                "Fecha evento": ev.get("fecha_evento", ""),
+                "ID usuario": r["usuario_id"],
+                "Username": u.get("username", ""),
+                "Nombre completo": u.get("nombre_completo", ""),
+                "Correo": u.get("correo", ""),
+                "Estado": r.get("estado", ""),
+                "Registrado en": r.get("registrado_en", ""),
+            }
+        )
+
+    df_excel = pd.DataFrame(filas_excel)
+    buffer = BytesIO()
+    df_excel.to_excel(buffer, index=False, engine="xlsxwriter")
+    return buffer.getvalue()
+
+
+@st.fragment
 def dashboard_view(usuario_id: int):
     st.subheader("📊 Dashboard general de eventos")
 
@@ -573,18 +878,11 @@ def dashboard_view(usuario_id: int):
     eventos_ids = list(eventos_dict.keys())
 
     # =======================
-    # Traer registros de eventos_asistentes
+    # Conteos por evento (agregados en Postgres)
     # =======================
     try:
-        res_asist = (
-            supabase.table("eventos_asistentes")
-            .select("evento_id, usuario_id, registrado_en, estado")
-            .in_("evento_id", eventos_ids)
-            .execute()
-        )
-        registros = res_asist.data or []
+        resumen = get_resumen_asistencia(eventos_ids)
     except Exception as e:
-        registros = []
         st.error(f"Error al obtener datos de eventos_asistentes para el dashboard: {e}")
         return
 
@@ -592,8 +890,8 @@ def dashboard_view(usuario_id: int):
     # KPIs globales
     # =======================
     total_eventos = len(eventos_filtrados)
-    total_registros = len(registros)
-    total_asistidos = sum(1 for r in registros if r.get("estado") == "ASISTIDO")
+    total_asistidos = sum(d["asistidos"] for d in resumen.values())
+    total_registros = total_asistidos + sum(d["registrados"] for d in resumen.values())
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Eventos filtrados", total_eventos)
@@ -603,19 +901,6 @@ def dashboard_view(usuario_id: int):
     # =======================
     # Resumen por evento
     # =======================
-    resumen = {}
-    for e_id in eventos_ids:
-        resumen[e_id] = {"registrados": 0, "asistidos": 0}
-
-    for r in registros:
-        e_id = r["evento_id"]
-        if e_id not in resumen:
-            resumen[e_id] = {"registrados": 0, "asistidos": 0}
-        if r.get("estado") == "ASISTIDO":
-            resumen[e_id]["asistidos"] += 1
-        else:
-            resumen[e_id]["registrados"] += 1
-
     filas_resumen = []
     for e_id, data in resumen.items():
         ev = eventos_dict.get(e_id, {})
@@ -671,10 +956,10 @@ def dashboard_view(usuario_id: int):
     )
     evento_det_id = mapa_evt[evento_det_label]
 
-    # Filtrar registros del evento elegido
-    regs_evt = [r for r in registros if r["evento_id"] == evento_det_id]
-    cant_reg = len(regs_evt)
-    cant_asist = sum(1 for r in regs_evt if r.get("estado") == "ASISTIDO")
+    # Conteos del evento elegido
+    resumen_evt = resumen[evento_det_id]
+    cant_asist = resumen_evt["asistidos"]
+    cant_reg = resumen_evt["registrados"] + cant_asist
 
     c1, c2 = st.columns(2)
     c1.metric("Registrados en el evento", cant_reg)
@@ -685,63 +970,99 @@ def dashboard_view(usuario_id: int):
     # =======================
     st.markdown("### 📥 Exportar detalle filtrado a Excel")
 
-    if not registros:
+    if total_registros == 0:
         st.info("No hay registros para exportar.")
         return
 
-    # Traer datos de usuarios para enriquecer el Excel
-    user_ids = list({r["usuario_id"] for r in registros})
-    try:
-        res_users = (
-            supabase.table("usuarios")
-            .select("id, username, nombres, apellidos, correo")
-            .in_("id", user_ids)
-            .execute()
-        )
-        usuarios_rows = res_users.data or []
-    except Exception as e:
-        usuarios_rows = []
-        st.error(f"Error al obtener usuarios para el Excel: {e}")
-        return
+    # El Excel se genera solo cuando se pide; queda guardado en sesión junto
+    # con los eventos que cubre, para no recalcularlo en cada rerun
+    clave_excel = tuple(sorted(eventos_ids))
+    if st.button("Preparar Excel", use_container_width=True):
+        try:
+            st.session_state.excel_reporte = (
+                clave_excel,
+                generar_excel_eventos(eventos_dict, eventos_ids),
+            )
+        except Exception as e:
+            st.error(f"Error al obtener registros para el Excel: {e}")
+            return
 
-    usuarios_dict = {u["id"]: u for u in usuarios_rows}
+    excel = st.session_state.excel_reporte
+    if excel and excel[0] == clave_excel:
+        st.download_button(
+            label="Descargar reporte filtrado en Excel",
+            data=excel[1],
+            file_name="reporte_eventos_filtrado.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            use_container_width=True,
+        )
 
-    filas_excel = []
-    for r in registros:
-        ev = eventos_dict.get(r["evento_id"], {})
-        u = usuarios_dict.get(r["usuario_id"], {})
 
-        filas_excel.append(
-            {
-                "ID evento": r["evento_id"],
-                "Nombre evento": ev.get("nombre", ""),
-                "Fecha evento": ev.get("fecha_evento", ""),
-                "ID usuario": r["usuario_id"],
-                "Username": u.get("username", ""),
-                "Nombre completo": f"{u.get('nombres','')} {u.get('apellidos','')}".strip(),
-                "Correo": u.get("correo", ""),
-                "Estado": r.get("estado", ""),
-                "Registrado en": r.get("registrado_en", ""),
-            }
+# ==========================
+# Ver alumnos registrados / asistentes (eventos_asistentes)
+# ==========================
+@st.cache_data(ttl=30, show_spinner=False)
+def get_asistentes_evento(evento_id: int, asistido: bool, pagina: int):
+    """
+    Una página (ASISTENTES_PAGE_SIZE) de registros de eventos_asistentes de un
+    evento, con datos del usuario. asistido=True trae solo los ASISTIDO;
+    False, el resto (incluye estado NULL).
+    """
+    desde = pagina * ASISTENTES_PAGE_SIZE
+    query = (
+        supabase.table("eventos_asistentes")
+        .select(
+            "usuario_id, registrado_en, estado, "
+            "usuarios(nombre_completo,correo,username)"
         )
+        .eq("evento_id", evento_id)
+    )
+    if asistido:
+        query = query.eq("estado", "ASISTIDO")
+    else:
+        query = query.or_("estado.neq.ASISTIDO,estado.is.null")
+    res = query.order("usuario_id").range(desde, desde + ASISTENTES_PAGE_SIZE - 1).execute()
+    return res.data or []
 
-    df_excel = pd.DataFrame(filas_excel)
-    buffer = BytesIO()
-    df_excel.to_excel(buffer, index=False)
-    buffer.seek(0)
-
-    st.download_button(
-        label="Descargar reporte filtrado en Excel",
-        data=buffer,
-        file_name="reporte_eventos_filtrado.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        use_container_width=True,
+
+def cargar_asistentes(evento_id: int, asistido: bool, paginas: int):
+    # Cada página queda en caché por separado: "Mostrar más" solo trae la nueva
+    registros = []
+    for pagina in range(paginas):
+        registros.extend(get_asistentes_evento(evento_id, asistido, pagina))
+    return registros
+
+
+def asistentes_a_dataframe(registros):
+    """
+    DataFrame listo para mostrar a partir de los registros de
+    get_asistentes_evento. Se aplana con json_normalize y las columnas se
+    arman de forma vectorizada; el nombre completo ya viene de la base.
+    """
+    df = pd.json_normalize(registros)
+    for col in ("usuario_id", "registrado_en", "estado", "usuarios.nombre_completo",
+                "usuarios.correo", "usuarios.username"):
+        if col not in df:
+            df[col] = None
+
+    texto = df[[
+        "usuarios.nombre_completo", "usuarios.correo", "usuarios.username",
+        "registrado_en", "estado",
+    ]].fillna("").astype(str)
+
+    return pd.DataFrame(
+        {
+            "ID usuario": df["usuario_id"],
+            "Username": texto["usuarios.username"],
+            "Nombre": texto["usuarios.nombre_completo"],
+            "Correo": texto["usuarios.correo"],
+            "Registrado en": texto["registrado_en"],
+            "Estado": texto["estado"],
+        }
     )
 
 
-# ==========================
-# Ver alumnos registrados / asistentes (eventos_asistentes)
-# ==========================
+@st.fragment
 def inscripciones_asistencia_view(usuario_id: int):
     st.subheader("👨‍🎓 Inscripciones y asistencia")
 
@@ -751,64 +1072,109 @@ def inscripciones_asistencia_view(usuario_id: int):
         st.info("No tienes eventos activos para revisar.")
         return
 
-    mapa_eventos = {f"{e['nombre']} (#{e['id']})": e["id"] for e in eventos}
-    evento_label = st.selectbox(
+    eventos_por_id = {e["id"]: e for e in eventos}
+    evento_id = st.selectbox(
         "Selecciona evento",
-        list(mapa_eventos.keys()),
+        list(eventos_por_id),
+        format_func=lambda i: f"{eventos_por_id[i]['nombre']} (#{i})",
         key="evento_inscripciones"
     )
-    evento_id = mapa_eventos[evento_label]
-
-    st.markdown(f"### Evento seleccionado: {evento_label}")
-
+    evento = eventos_por_id[evento_id]
+
+    col_titulo, col_refrescar = st.columns([4, 1])
+    with col_titulo:
+        st.markdown(f"### Evento seleccionado: {evento['nombre']} (#{evento_id})")
+    with col_refrescar:
+        # Los registros salen de la caché mientras no cambie el evento;
+        # este botón fuerza a traerlos de nuevo
+        if st.button("🔄 Refrescar", use_container_width=True, key="refrescar_asistentes"):
+            get_asistentes_evento.clear()
+            get_resumen_asistencia.clear()
+
+    # Conteos de todos los eventos en una sola consulta agregada. Comparte
+    # entrada de caché con el dashboard sin filtros, pero solo está caliente
+    # si se abrió el Dashboard hace poco; si no, esta vista hace la llamada.
+    # Se leen después de "Refrescar" para no mezclar listas nuevas con
+    # totales viejos.
     try:
-        res = (
-            supabase.table("eventos_asistentes")
-            .select(
-                "evento_id, usuario_id, registrado_en, estado, "
-                "usuarios(nombres,apellidos,correo,username)"
-            )
-            .eq("evento_id", evento_id)
-            .execute()
-        )
-        registros = res.data or []
+        conteo = get_resumen_asistencia([e["id"] for e in eventos]).get(evento_id)
+    except Exception:
+        conteo = None
+
+    def total_de(filas, clave):
+        # " (mostrando X de N)" mientras falten páginas por cargar
+        if conteo and len(filas) < conteo[clave]:
+            return f" (mostrando {len(filas)} de {conteo[clave]})"
+        return f" ({len(filas)})"
+
+    # Páginas cargadas de cada lista ("Mostrar más" suma una)
+    key_reg = f"asistentes_paginas_{evento_id}_reg"
+    key_asis = f"asistentes_paginas_{evento_id}_asis"
+    paginas_reg = st.session_state.get(key_reg, 1)
+    paginas_asis = st.session_state.get(key_asis, 1)
+
+    # Supabase separa registrados y asistidos; ambas consultas van en
+    # paralelo, así la espera es la de la más lenta
+    try:
+        with ejecutor_paralelo(2) as ex:
+            f_reg = ex.submit(cargar_asistentes, evento_id, False, paginas_reg)
+            f_asis = ex.submit(cargar_asistentes, evento_id, True, paginas_asis)
+        regs, asis = f_reg.result(), f_asis.result()
+        df_reg = asistentes_a_dataframe(regs)
+        df_asis = asistentes_a_dataframe(asis)
     except Exception as e:
-        registros = []
         st.error(f"Error al obtener datos de eventos_asistentes: {e}")
+        return
 
-    registrados = []
-    asistidos = []
-
-    for r in registros:
-        u = r.get("usuarios") or {}
-        nombre_completo = f"{u.get('nombres','')} {u.get('apellidos','')}".strip()
-        fila = {
-            "ID usuario": r["usuario_id"],
-            "Username": u.get("username", ""),
-            "Nombre": nombre_completo,
-            "Correo": u.get("correo", ""),
-            "Registrado en": r.get("registrado_en", ""),
-            "Estado": r.get("estado", ""),
-        }
-
-        if r.get("estado") == "ASISTIDO":
-            asistidos.append(fila)
-        else:
-            registrados.append(fila)
+    if df_reg.empty and df_asis.empty:
+        st.info("Aún no hay estudiantes registrados en este evento.")
+        return
 
-    st.markdown("### 📝 Estudiantes registrados (no asistidos)")
-    if registrados:
-        st.table(registrados)
+    st.markdown(f"### 📝 Estudiantes registrados (no asistidos){total_de(regs, 'registrados')}")
+    if not df_reg.empty:
+        st.dataframe(df_reg, use_container_width=True, hide_index=True)
+        if len(regs) == paginas_reg * ASISTENTES_PAGE_SIZE:
+            if st.button("Mostrar más registrados", key="mas_registrados"):
+                st.session_state[key_reg] = paginas_reg + 1
+                st.rerun(scope="fragment")
     else:
         st.info("No hay estudiantes solo registrados para este evento.")
 
-    st.markdown("### ✅ Estudiantes que asistieron")
-    if asistidos:
-        st.table(asistidos)
+    st.markdown(f"### ✅ Estudiantes que asistieron{total_de(asis, 'asistidos')}")
+    if not df_asis.empty:
+        st.dataframe(df_asis, use_container_width=True, hide_index=True)
+        if len(asis) == paginas_asis * ASISTENTES_PAGE_SIZE:
+            if st.button("Mostrar más asistentes", key="mas_asistentes"):
+                st.session_state[key_asis] = paginas_asis + 1
+                st.rerun(scope="fragment")
     else:
         st.info("No hay estudiantes marcados como asistentes para este evento.")
 
 
+# ==========================
+# Precarga en paralelo (organizador)
+# ==========================
+def precargar_eventos_y_resumen(usuario_id: int):
+    # Los conteos dependen de los ids de eventos, así que van en cadena; la
+    # clave coincide con la del dashboard sin filtros
+    eventos = get_eventos_para_organizador(usuario_id)
+    if eventos:
+        get_resumen_asistencia([e["id"] for e in eventos])
+
+
+def precargar_datos_organizador(usuario_id: int):
+    """
+    Lanza en paralelo las consultas independientes que usa el dashboard.
+    Como todas están en caché, la vista luego las lee sin volver a
+    Supabase: la espera es la de la consulta más lenta, no la suma.
+    """
+    # Los errores no se recogen aquí: cada vista reintenta la consulta y los muestra
+    with ejecutor_paralelo(3) as ex:
+        ex.submit(get_organizaciones)
+        ex.submit(get_facultades_all)
+        ex.submit(precargar_eventos_y_resumen, usuario_id)
+
+
 # ==========================
 # Pantalla principal
 # ==========================
@@ -823,6 +1189,8 @@ def main_app():
     if st.sidebar.button("Cerrar sesión", use_container_width=True):
         st.session_state.perfil = None
         st.session_state.evento_edit = None
+        st.session_state.eventos_cursores = [None]
+        st.session_state.excel_reporte = None
         st.rerun()
 
     st.title("🎫 Sistema de Gestión de Eventos")
@@ -830,22 +1198,33 @@ def main_app():
     es_organizador = (rol_nombre == "ORGANIZADOR")
 
     if es_organizador:
-        pestañas = st.tabs([
-            "Dashboard",
-            "Mis eventos",
-            "Enrolar organizadores",
-            "Inscripciones y asistencia"
-        ])
-        with pestañas[0]:
+        # A diferencia de st.tabs (que ejecuta todas las pestañas en cada
+        # rerun), solo se ejecuta la sección elegida, con sus consultas.
+        # Dentro de ella, cada vista es un st.fragment y sus widgets solo
+        # re-ejecutan esa vista.
+        seccion = st.radio(
+            "Sección",
+            [
+                "Dashboard",
+                "Mis eventos",
+                "Enrolar organizadores",
+                "Inscripciones y asistencia",
+            ],
+            horizontal=True,
+            key="seccion_organizador",
+            label_visibility="collapsed",
+        )
+        if seccion == "Dashboard":
+            precargar_datos_organizador(perfil["id"])
             dashboard_view(perfil["id"])
-        with pestañas[1]:
+        elif seccion == "Mis eventos":
             crear_evento_form(perfil["id"])
             st.divider()
             lista_eventos_view(perfil["id"], es_organizador=True)
             editar_evento_view()
-        with pestañas[2]:
+        elif seccion == "Enrolar organizadores":
             enrolar_organizador_view()
-        with pestañas[3]:
+        else:
             inscripciones_asistencia_view(perfil["id"])
     else:
         st.header("Vista estudiante")
@@ -0,0 +1,33 @@
+-- Índices para los filtros que usa app.py en cada render.
+-- Las migraciones se aplican dentro de una transacción, por eso no se usa
+-- CREATE INDEX CONCURRENTLY; en una base con mucho tráfico conviene crearlos
+-- a mano con CONCURRENTLY fuera de la transacción.
+
+-- Eventos ACTIVO de un creador (query_eventos_activos)
+CREATE INDEX IF NOT EXISTS ix_eventos_activos_creador
+    ON eventos (usuario_creador_id)
+    WHERE estado = 'ACTIVO';
+
+-- Listado paginado por keyset (estado = 'ACTIVO' ORDER BY id DESC)
+CREATE INDEX IF NOT EXISTS ix_eventos_activos_id
+    ON eventos (id)
+    WHERE estado = 'ACTIVO';
+
+-- Enrolamientos: evita duplicados en el upsert y sirve la búsqueda por evento
+CREATE UNIQUE INDEX IF NOT EXISTS ix_eo_evento_usuario
+    ON eventos_organizadores (evento_id, usuario_id);
+
+-- Enrolamientos por organizador (embebido filtrado por usuario_id)
+CREATE INDEX IF NOT EXISTS ix_eo_usuario
+    ON eventos_organizadores (usuario_id);
+
+-- Login por username y listado de organizadores por rol
+CREATE UNIQUE INDEX IF NOT EXISTS ix_usuarios_username
+    ON usuarios (username);
+
+CREATE INDEX IF NOT EXISTS ix_usuarios_rol
+    ON usuarios (rol_id);
+
+-- Registros de asistencia por evento (dashboard e inscripciones)
+CREATE INDEX IF NOT EXISTS ix_eventos_asistentes_evento
+    ON eventos_asistentes (evento_id);
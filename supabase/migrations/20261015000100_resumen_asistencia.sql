@@ -0,0 +1,16 @@
+-- Conteo de registrados / asistidos por evento, agregado en Postgres.
+-- Lo usa dashboard_view vía supabase.rpc("resumen_asistencia", ...), así no
+-- se transfieren todas las filas de eventos_asistentes para contarlas en Python.
+CREATE OR REPLACE FUNCTION resumen_asistencia(evento_ids bigint[])
+RETURNS TABLE (evento_id bigint, registrados bigint, asistidos bigint)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        ea.evento_id,
+        COUNT(*) FILTER (WHERE ea.estado IS DISTINCT FROM 'ASISTIDO'),
+        COUNT(*) FILTER (WHERE ea.estado = 'ASISTIDO')
+    FROM eventos_asistentes ea
+    WHERE ea.evento_id = ANY (evento_ids)
+    GROUP BY ea.evento_id;
+$$;
@@ -0,0 +1,7 @@
+-- Nombre completo calculado en la base: las vistas de asistentes y el Excel
+-- lo leen directamente en lugar de concatenar nombres y apellidos en Python.
+ALTER TABLE usuarios
+    ADD COLUMN IF NOT EXISTS nombre_completo text
+    GENERATED ALWAYS AS (
+        trim(coalesce(nombres, '') || ' ' || coalesce(apellidos, ''))
+    ) STORED;
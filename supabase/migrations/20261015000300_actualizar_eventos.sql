@@ -0,0 +1,20 @@
+-- Actualización en bloque de los eventos editados en la tabla de "Mis eventos".
+-- Lo usa aplicar_cambios_eventos vía supabase.rpc("actualizar_eventos", ...):
+-- un solo viaje para todas las filas, pero solo se tocan las columnas que se
+-- editan en la tabla. Organización, facultad y creador no se reescriben desde
+-- una página en caché, y un evento desactivado mientras tanto sigue INACTIVO.
+CREATE OR REPLACE FUNCTION actualizar_eventos(cambios jsonb)
+RETURNS void
+LANGUAGE sql
+AS $$
+    UPDATE eventos e
+    SET
+        nombre = c.nombre,
+        fecha_evento = c.fecha_evento,
+        limite_asistentes = c.limite_asistentes,
+        actualizado_en = now()
+    FROM jsonb_to_recordset(cambios)
+        AS c(id bigint, nombre text, fecha_evento date, limite_asistentes integer)
+    WHERE e.id = c.id
+      AND e.estado = 'ACTIVO';
+$$;